@@ -0,0 +1,157 @@
+import contextlib
+import math
+import threading
+
+import numpy as np
+
+# Kernels on plain floats. They are compiled when `numba` is installed and
+# otherwise run as ordinary Python, which is still cheaper than NumPy on
+# scalars. Compiled, the scalar kernels release the GIL and can run from
+# several threads; payoff_grid runs on numba's own thread pool instead.
+try:
+    from numba import njit, prange, threading_layer
+except ImportError:
+    njit = None
+    prange = range
+    threading_layer = None
+
+NUMBA_AVAILABLE = njit is not None
+_INV_SQRT_2 = 0.7071067811865476
+_INV_SQRT_2PI = 0.3989422804014327
+# replaced by a lock at import when numba runs on its workqueue layer
+_GRID_LOCK = contextlib.nullcontext()
+
+
+def _jit(**options):
+    def decorator(func):
+        if njit is None:
+            return func
+        return njit(**options)(func)
+
+    return decorator
+
+
+@_jit(cache=True, fastmath=True, error_model="numpy", nogil=True)
+def _norm_cdf(x):
+    # erfc keeps full precision in the lower tail, unlike 1 + erf
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
+
+
+@_jit(cache=True, fastmath=True, error_model="numpy", nogil=True)
+def bs_price(S, K, r, iv, tau, is_call):
+    """
+    Price of a single European option using the Black-Scholes model.
+    Degenerates to the (discounted) intrinsic value when `tau` or `iv` is 0.
+    """
+    disc = math.exp(-r * tau)
+    if tau <= 0.0 or iv <= 0.0:
+        if is_call:
+            return max(S - K * disc, 0.0)
+        return max(K * disc - S, 0.0)
+    sqrt_tau = math.sqrt(tau)
+    d1 = (math.log(S / K) + (r + 0.5 * iv * iv) * tau) / (iv * sqrt_tau)
+    d2 = d1 - iv * sqrt_tau
+    if is_call:
+        return S * _norm_cdf(d1) - K * disc * _norm_cdf(d2)
+    return K * disc * _norm_cdf(-d2) - S * _norm_cdf(-d1)
+
+
+@_jit(cache=True, fastmath=True, error_model="numpy", nogil=True)
+def bs_greeks(S, K, r, iv, tau, is_call):
+    """
+    Price, delta, gamma, theta, vega and rho of a single European option
+    using the Black-Scholes model.
+    """
+    sign = 1.0 if is_call else -1.0
+    disc = math.exp(-r * tau)
+    if tau <= 0.0 or iv <= 0.0:
+        # limit of the formulas as the distribution collapses on the forward
+        moneyness = sign * (S - K * disc)
+        cdf_d1 = 1.0 if moneyness > 0.0 else 0.5 if moneyness == 0.0 else 0.0
+        cdf_d2 = cdf_d1
+        gamma = vega = decay = 0.0
+    else:
+        sqrt_tau = math.sqrt(tau)
+        d1 = (math.log(S / K) + (r + 0.5 * iv * iv) * tau) / (iv * sqrt_tau)
+        d2 = d1 - iv * sqrt_tau
+        cdf_d1 = _norm_cdf(sign * d1)
+        cdf_d2 = _norm_cdf(sign * d2)
+        pdf_d1 = _INV_SQRT_2PI * math.exp(-0.5 * d1 * d1)
+        gamma = pdf_d1 / (S * iv * sqrt_tau)
+        vega = S * sqrt_tau * pdf_d1
+        decay = -S * iv * pdf_d1 / (2.0 * sqrt_tau)
+    price = sign * (S * cdf_d1 - K * disc * cdf_d2)
+    delta = sign * cdf_d1
+    theta = decay - sign * r * K * disc * cdf_d2
+    rho = sign * K * tau * disc * cdf_d2
+    return price, delta, gamma, theta, vega, rho
+
+
+@_jit(cache=True, fastmath=True, error_model="numpy", parallel=True)
+def _payoff_grid(Ss, Ks, r, ivs, taus, is_calls, quantities, out):
+    # only the spot varies across the grid, fold everything else per option
+    n = Ks.shape[0]
+    log_Ks = np.empty(n)
+    drifts = np.empty(n)
+    vols = np.empty(n)
+    disc_Ks = np.empty(n)
+    for i in range(n):
+        log_Ks[i] = math.log(Ks[i])
+        drifts[i] = (r + 0.5 * ivs[i] * ivs[i]) * taus[i]
+        vols[i] = ivs[i] * math.sqrt(taus[i])
+        disc_Ks[i] = Ks[i] * math.exp(-r * taus[i])
+
+    for j in prange(Ss.shape[0]):
+        S = Ss[j]
+        log_S = math.log(S)
+        total = 0.0
+        for i in range(n):
+            if vols[i] > 0.0:
+                d1 = (log_S - log_Ks[i] + drifts[i]) / vols[i]
+                d2 = d1 - vols[i]
+                price = S * _norm_cdf(d1) - disc_Ks[i] * _norm_cdf(d2)
+            else:
+                price = max(S - disc_Ks[i], 0.0)
+            if not is_calls[i]:
+                # put-call parity
+                price += disc_Ks[i] - S
+            total += quantities[i] * price
+        out[j] = total
+
+
+def payoff_grid(Ss, Ks, r, ivs, taus, is_calls, quantities, out):
+    """
+    Fills `out[j]` with the value of the portfolio of options `i`, held in
+    `quantities[i]`, when the underlying is at `Ss[j]`.
+    """
+    with _GRID_LOCK:
+        _payoff_grid(Ss, Ks, r, ivs, taus, is_calls, quantities, out)
+
+
+def _warm_up():
+    bs_price(100.0, 100.0, 0.05, 0.2, 1.0, True)
+    bs_greeks(100.0, 100.0, 0.05, 0.2, 1.0, True)
+    values = np.ones(1)
+    # the chart prices a read-only float32 grid, a signature of its own
+    grid = np.ones(1, dtype=np.float32)
+    grid.flags.writeable = False
+    for Ss in (values, grid):
+        payoff_grid(
+            Ss,
+            values,
+            0.05,
+            values,
+            values,
+            np.ones(1, dtype=bool),
+            values,
+            np.empty(1, dtype=Ss.dtype),
+        )
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
+    # the layer is only known once the warm-up has launched payoff_grid
+    if threading_layer() == "workqueue":
+        # workqueue aborts the process when its thread pool is entered from
+        # several threads at once, so the grid launches take turns
+        _GRID_LOCK = threading.Lock()
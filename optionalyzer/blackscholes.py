@@ -1,204 +1,362 @@
-from scipy.stats import norm
 import numpy as np
-from scipy.optimize import minimize
-import yfinance
+from scipy.special import ndtr
+from scipy.optimize import brentq
 import pandas as pd
 import requests
 import datetime
+import re
 
 from optionalyzer import RISK_FREE_RATE
+from optionalyzer import _bs_kernel
 
 TODAY = datetime.datetime.today().strftime("%d-%m-%Y")
+REQUEST_TIMEOUT = 10
+_INV_SQRT_2PI = 0.3989422804014327
+_GREEKS = ("delta", "gamma", "theta", "vega", "rho")
+IV_TOLERANCE = 1e-6
+IV_MAX_ITER = 64
+IV_BOUNDS = (1e-6, 5.0)
+# the scraped prices carry the day's change, e.g. "₹1,234.5+12.3 (1.0%)"
+_PRICE_CHANGE = re.compile(r"[+-]|0\.00 \(")
+
+
+def _norm_pdf(x):
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _is_scalar(*args):
+    return all(np.ndim(arg) == 0 for arg in args)
+
+
+def _scalar_option(S, K, r, iv, tau, is_call, greeks):
+    # plain floats skip NumPy's dispatch, which dominates on a single option
+    args = (float(S), float(K), float(r), float(iv), float(tau), is_call)
+    if not greeks:
+        return _bs_kernel.bs_price(*args)
+    price, *values = _bs_kernel.bs_greeks(*args)
+    return price, dict(zip(_GREEKS, values))
+
+
+def _safe_divide(a, b):
+    # 0 wherever the divisor vanishes, which is the limit of every ratio here
+    a, b = np.broadcast_arrays(a, b)
+    return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+
+def _d1(S, K, r, vol, tau):
+    # S is usually the only input spanning the spot grid, so everything else
+    # is folded into one per-option shift before meeting it
+    shift = r * tau + 0.5 * vol * vol - np.log(K)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(S) + shift) / vol
+    if np.all(vol > 0):
+        return d1
+    # with no volatility left (at expiry) d1 collapses to +-inf, or to 0 when
+    # at-the-money forward, so the prices reduce to the intrinsic value
+    forward = np.log(S / K) + r * tau
+    limit = np.where(forward == 0, 0.0, np.copysign(np.inf, forward))
+    return np.where(vol > 0, d1, limit)
+
+
+def _vega(S, sqrt_tau, pdf_d1):
+    return S * sqrt_tau * pdf_d1
+
+
+def _price_and_greeks(S, K, r, iv, tau, is_call, greeks):
+    if _is_scalar(S, K, r, iv, tau):
+        return _scalar_option(S, K, r, iv, tau, is_call, greeks)
+    sqrt_tau = np.sqrt(tau)
+    disc = np.exp(-r * tau)
+    vol = iv * sqrt_tau
+    d1 = _d1(S, K, r, vol, tau)
+    d2 = d1 - vol
+    # a put is a call with the sign of d1, d2 and of the result flipped
+    sign = 1.0 if is_call else -1.0
+    if not is_call:
+        d1, d2 = -d1, -d2
+    cdf_d1 = ndtr(d1)
+    cdf_d2 = ndtr(d2)
+    price = sign * (S * cdf_d1 - K * disc * cdf_d2)
+    if not greeks:
+        return price
 
+    # the density is even, so flipping d1 leaves it unchanged
+    pdf_d1 = _norm_pdf(d1)
+    decay = _safe_divide(-S * iv * pdf_d1, 2 * sqrt_tau)
+    greeks = {
+        "delta": sign * cdf_d1,
+        "gamma": _safe_divide(pdf_d1, S * vol),
+        "theta": decay - sign * r * K * disc * cdf_d2,
+        "vega": _vega(S, sqrt_tau, pdf_d1),
+        "rho": sign * K * tau * disc * cdf_d2,
+    }
+    return price, greeks
 
-class BlackScholes:
-    def __init__(self) -> None:
-        pass
-
-    def __d1(self, S, K, r, iv, tau):
-        multiplier = 1 / (iv * np.sqrt(tau) + 1e-10)
-        term1 = np.log(S / K)
-        term2 = (r + iv**2 / 2) * tau
-        return multiplier * (term1 + term2)
-
-    def __d2(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return d1 - iv * np.sqrt(tau)
-
-    def __vega(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return S * np.sqrt(tau) * norm.pdf(d1)
-
-    def __call_delta(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return norm.cdf(d1)
-
-    def __put_delta(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return norm.cdf(d1) - 1
-
-    def __call_theta(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        d2 = self.__d2(S, K, r, iv, tau)
-        term_1 = -S * iv * norm.pdf(d1) / (2 * np.sqrt(tau) + 1e-10)
-        term_2 = r * K * np.exp(-r * tau) * norm.cdf(d2)
-        return term_1 - term_2
-
-    def __put_theta(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        d2 = self.__d2(S, K, r, iv, tau)
-        term_1 = -S * iv * norm.pdf(d1) / (2 * np.sqrt(tau) + 1e-10)
-        term_2 = r * K * np.exp(-r * tau) * norm.cdf(-d2)
-        return term_1 + term_2
-
-    def __call_gamma(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return norm.pdf(d1) / (S * iv * np.sqrt(tau) + 1e-10)
-
-    def __put_gamma(self, S, K, r, iv, tau):
-        d1 = self.__d1(S, K, r, iv, tau)
-        return norm.pdf(d1) / (S * iv * np.sqrt(tau) + 1e-10)
-
-    def __call_rho(self, S, K, r, iv, tau):
-        d2 = self.__d2(S, K, r, iv, tau)
-        return K * tau * np.exp(-r * tau) * norm.cdf(d2)
-
-    def __put_rho(self, S, K, r, iv, tau):
-        d2 = self.__d2(S, K, r, iv, tau)
-        return -K * tau * np.exp(-r * tau) * norm.cdf(-d2)
-
-    def call(self, S, K, r, iv, tau, greeks=False):
-        """
-        Calculates the price of a call option using the Black-Scholes model.
-
-        Parameters
-        ----------
-        S : float
-            The current price of the underlying asset.
-        K : float
-            The strike price of the option.
-        r : float
-            The risk-free interest rate.
-        iv : float
-            The volatility of the underlying asset.
-        tau : float
-            The time to maturity of the option in years.
-        greeks : bool, optional
-            If True, returns the greeks of the option. The default is False.
 
-        Returns
-        -------
-        float
-            The price of the call option.
-        dict
-            The greeks of the option if greeks=True.
-        """
-        d1 = self.__d1(S, K, r, iv, tau)
-        d2 = self.__d2(S, K, r, iv, tau)
-        term_1 = S * norm.cdf(d1)
-        term_2 = K * np.exp(-r * tau) * norm.cdf(d2)
-        price = term_1 - term_2
-        if greeks:
-            greeks = {
-                "delta": self.__call_delta(S, K, r, iv, tau),
-                "gamma": self.__call_gamma(S, K, r, iv, tau),
-                "theta": self.__call_theta(S, K, r, iv, tau),
-                "vega": self.__vega(S, K, r, iv, tau),
-                "rho": self.__call_rho(S, K, r, iv, tau),
-            }
-            return price, greeks
-        return price
+def bs_call(S, K, r, iv, tau, greeks=False):
+    """
+    Calculates the price of a call option using the Black-Scholes model.
+
+    Parameters
+    ----------
+    S : float
+        The current price of the underlying asset.
+    K : float
+        The strike price of the option.
+    r : float
+        The risk-free interest rate.
+    iv : float
+        The volatility of the underlying asset.
+    tau : float
+        The time to maturity of the option in years.
+    greeks : bool, optional
+        If True, returns the greeks of the option. The default is False.
+
+    Returns
+    -------
+    float
+        The price of the call option.
+    dict
+        The greeks of the option if greeks=True.
+    """
+    return _price_and_greeks(S, K, r, iv, tau, True, greeks)
 
-    def put(self, S, K, r, iv, tau, greeks=False):
-        """
-        Calculates the price of a put option using the Black-Scholes model.
 
-        Parameters
-        ----------
-        S : float
-            The current price of the underlying asset.
-        K : float
-            The strike price of the option.
-        r : float
-            The risk-free interest rate.
-        iv : float
-            The volatility of the underlying asset.
-        tau : float
-            The time to maturity of the option in years.
-        greeks : bool, optional
-            If True, returns the greeks of the option. The default is False.
+def bs_put(S, K, r, iv, tau, greeks=False):
+    """
+    Calculates the price of a put option using the Black-Scholes model.
+
+    Parameters
+    ----------
+    S : float
+        The current price of the underlying asset.
+    K : float
+        The strike price of the option.
+    r : float
+        The risk-free interest rate.
+    iv : float
+        The volatility of the underlying asset.
+    tau : float
+        The time to maturity of the option in years.
+    greeks : bool, optional
+        If True, returns the greeks of the option. The default is False.
+
+    Returns
+    -------
+    float
+        The price of the put option.
+    dict
+        The greeks of the option if greeks=True.
+    """
+    return _price_and_greeks(S, K, r, iv, tau, False, greeks)
 
-        Returns
-        -------
-        float
-            The price of the put option.
-        dict
-            The greeks of the option if greeks=True.
-        """
-        d1 = self.__d1(S, K, r, iv, tau)
-        d2 = self.__d2(S, K, r, iv, tau)
-        term_1 = K * np.exp(-r * tau) * norm.cdf(-d2)
-        term_2 = S * norm.cdf(-d1)
-        price = term_1 - term_2
-
-        if greeks:
-            greeks = {
-                "delta": self.__put_delta(S, K, r, iv, tau),
-                "gamma": self.__put_gamma(S, K, r, iv, tau),
-                "theta": self.__put_theta(S, K, r, iv, tau),
-                "vega": self.__vega(S, K, r, iv, tau),
-                "rho": self.__put_rho(S, K, r, iv, tau),
-            }
-            return price, greeks
-        return price
 
-    def implied_volatility(
-        self, option_price, S, K, r, tau, option_type="call", verbose=1
+def bs_price(S, K, r, iv, tau, is_call):
+    """
+    Calculates the price of calls and puts in a single broadcasted pass.
+    Puts are priced from the calls through the put-call parity.
+
+    Parameters
+    ----------
+    S : float or array_like
+        The current price of the underlying asset.
+    K : float or array_like
+        The strike price of the option.
+    r : float
+        The risk-free interest rate.
+    iv : float or array_like
+        The volatility of the underlying asset.
+    tau : float or array_like
+        The time to maturity of the option in years.
+    is_call : bool or array_like
+        True for a call and False for a put.
+
+    Returns
+    -------
+    numpy.ndarray
+        The price of the options.
+    """
+    prices = np.asarray(bs_call(S, K, r, iv, tau, greeks=False))
+    is_put = np.logical_not(is_call)
+    shape = np.broadcast(prices, is_put).shape
+    if prices.shape != shape:
+        # the same options are asked for as calls and as puts
+        prices = np.array(np.broadcast_to(prices, shape))
+    # put-call parity
+    np.subtract(prices, S, out=prices, where=is_put)
+    np.add(prices, K * np.exp(-r * tau), out=prices, where=is_put)
+    return prices
+
+
+def bs_portfolio(S, K, r, iv, tau, is_call, quantities):
+    """
+    Calculates the value of a portfolio of calls and puts for every price of
+    the underlying asset in `S`.
+
+    Parameters
+    ----------
+    S : float or array_like
+        The price(s) of the underlying asset. A float32 array is priced and
+        returned in float32.
+    K : array_like
+        The strike prices of the options.
+    r : float
+        The risk-free interest rate.
+    iv : array_like
+        The volatilities of the options.
+    tau : array_like
+        The times to maturity of the options in years.
+    is_call : array_like
+        True for the calls and False for the puts.
+    quantities : array_like
+        The quantity held of each option, negative for short positions.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        The value of the portfolio at every price in `S`.
+
+    Raises
+    ------
+    ValueError
+        If the per-option arguments do not have the same length.
+    """
+    S = np.asarray(S)
+    if S.dtype.kind != "f":
+        S = S.astype(float)
+    # a single precision grid is priced in single precision
+    dtype = S.dtype
+    # the compiled kernel does not check bounds, the options must line up
+    K = np.ascontiguousarray(K, dtype=float)
+    iv = np.ascontiguousarray(iv, dtype=float)
+    tau = np.ascontiguousarray(tau, dtype=float)
+    is_call = np.ascontiguousarray(is_call, dtype=bool)
+    quantities = np.ascontiguousarray(quantities, dtype=float)
+    if K.ndim != 1 or any(
+        values.shape != K.shape for values in (iv, tau, is_call, quantities)
     ):
-        """
-        Calculates the implied volatility of an option using the Black-Scholes
-        model.
-
-        Parameters
-        ----------
-        S : float
-            The current price of the underlying asset.
-        K : float
-            The strike price of the option.
-        r : float
-            The risk-free interest rate.
-        tau : float
-            The time to maturity of the option in years.
-        option_price : float
-            The price of the option.
-        option_type : str, optional
-            The type of the option. The default is "call".
-
-        Returns
-        -------
-        float
-            The implied volatility of the option.
-        """
-        if option_type == "call":
-            option = self.call
-        elif option_type == "put":
-            option = self.put
+        raise ValueError(
+            "K, iv, tau, is_call and quantities must be one dimensional arrays of the same length."
+        )
+    if _bs_kernel.NUMBA_AVAILABLE and S.ndim == 1:
+        # compiled loop over the grid, without any (spots, options) temporary
+        out = np.empty(S.shape, dtype=dtype)
+        _bs_kernel.payoff_grid(S, K, r, iv, tau, is_call, quantities, out)
+        return out
+    K = K.astype(dtype, copy=False)
+    iv = iv.astype(dtype, copy=False)
+    tau = tau.astype(dtype, copy=False)
+    prices = bs_price(S[..., np.newaxis], K, r, iv, tau, is_call)
+    quantities = quantities.astype(dtype, copy=False)
+    # the matrix product sums over the options without a temporary
+    return prices @ quantities
+
+
+def _newton_iv(error, option_price, S, K, r, tau, initial_iv):
+    # vectorised Newton-Raphson on the price, vega being its derivative
+    sqrt_tau = np.sqrt(tau)
+    iv = np.array(np.broadcast_to(initial_iv, option_price.shape), dtype=float)
+    active = np.ones(iv.shape, dtype=bool)
+    converged = np.zeros(iv.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(IV_MAX_ITER):
+            diff = error(iv, option_price, S, K)
+            converged |= active & (np.abs(diff) < IV_TOLERANCE)
+            active &= ~converged
+            if not active.any():
+                break
+            d1 = _d1(S, K, r, iv * sqrt_tau, tau)
+            vega = _vega(S, sqrt_tau, _norm_pdf(d1))
+            iv = np.where(active, iv - diff / vega, iv)
+            active &= (vega >= IV_TOLERANCE) & (iv > IV_BOUNDS[0])
+            active &= iv < IV_BOUNDS[1]
+    return iv, converged
+
+
+def implied_vol(
+    option_price, S, K, r, tau, option_type="call", verbose=1, initial_iv=0.2
+):
+    """
+    Calculates the implied volatility of an option using the Black-Scholes
+    model. `option_price`, `S` and `K` can be arrays, in which case the
+    volatilities of all the options are solved for at once.
+
+    Parameters
+    ----------
+    S : float or array_like
+        The current price of the underlying asset.
+    K : float or array_like
+        The strike price of the option.
+    r : float
+        The risk-free interest rate.
+    tau : float
+        The time to maturity of the option in years.
+    option_price : float or array_like
+        The price of the option.
+    option_type : str, optional
+        The type of the option. The default is "call".
+    verbose : int, optional
+        Whether to print if the optimization succeeded. The default is 1.
+    initial_iv : float or array_like, optional
+        The volatility the solver starts from. A close guess, such as the
+        IV of a neighbouring strike, saves iterations. The default is 0.2.
+
+    Returns
+    -------
+    float or numpy.ndarray
+        The implied volatility of the option. `nan` if no volatility
+        reproduces `option_price`.
+    """
+    if option_type == "call":
+        option = bs_call
+    elif option_type == "put":
+        option = bs_put
+    else:
+        raise ValueError("option_type must be 'call' or 'put'")
+
+    def error(iv, option_price, S, K):
+        return option(S, K, r, iv, tau, greeks=False) - option_price
+
+    is_scalar = np.ndim(option_price) == np.ndim(S) == np.ndim(K) == 0
+    option_price, S, K = np.broadcast_arrays(
+        np.atleast_1d(option_price).astype(float), S, K
+    )
+    ivs, converged = _newton_iv(error, option_price, S, K, r, tau, initial_iv)
+
+    # Newton diverged, fall back to Brent's method on the price error. The
+    # price is increasing in iv, so a root exists only if the error changes
+    # sign over IV_BOUNDS; that is checked for all the options at once.
+    pending = np.flatnonzero(~converged)
+    args = (option_price[pending], S[pending], K[pending])
+    bracketed = error(IV_BOUNDS[0], *args) * error(IV_BOUNDS[1], *args) <= 0
+    ivs[pending[~bracketed]] = np.nan
+    for i in pending[bracketed]:
+        ivs[i] = brentq(
+            error, *IV_BOUNDS, args=(option_price[i], S[i], K[i]), xtol=IV_TOLERANCE
+        )
+        converged[i] = True
+
+    if verbose:
+        if converged.all():
+            print("Optimized Successfully!")
         else:
-            raise ValueError("option_type must be 'call' or 'put'")
+            print("Optimization Unsuccessful. No volatility matches the price.")
+    if is_scalar:
+        return ivs[0]
+    return ivs
 
-        def option_partial(iv):
-            return option(iv=iv, S=S, K=K, r=r, tau=tau, greeks=False)
 
-        def error(iv):
-            return np.square(option_partial(iv) - option_price)
+class BlackScholes:
+    """
+    The Black-Scholes pricing functions of this module grouped under a class,
+    as they were exposed before becoming module level functions.
+    """
 
-        res = minimize(error, 0.2)
-        if verbose:
-            if res.success:
-                print("Optimized Successfully!")
-            else:
-                print("Optimization Unsuccessful. Here is the final result.")
-        return res.x[0]
+    call = staticmethod(bs_call)
+    put = staticmethod(bs_put)
+    price = staticmethod(bs_price)
+    portfolio = staticmethod(bs_portfolio)
+    implied_volatility = staticmethod(implied_vol)
 
 
 class OptionChain:
@@ -213,6 +371,8 @@ class OptionChain:
         self.__spot_price = None
         self.__resolve_tickers()
         self.__option_chain = None
+        # reuse the connection (and its TLS handshake) across expiries
+        self.__session = requests.Session()
 
     @property
     def spot_price(self):
@@ -266,6 +426,9 @@ class OptionChain:
             raise ValueError("Invalid ticker. Only nifty and nifty-bank are supported.")
 
     def __get_spot_price(self):
+        # imported here as it is slow to load and only the option chain needs it
+        import yfinance
+
         if self.ticker == "nifty":
             ticker = yfinance.Ticker("^NSEI")
         elif self.ticker == "nifty-bank":
@@ -275,20 +438,15 @@ class OptionChain:
 
         self.__spot_price = ticker.history("1d", "1d")["Close"].values[0]
 
-    def __clean_price(self, x):
-        if "+" in x:
-            x = x.split("+")[0]
-        elif "-" in x:
-            x = x.split("-")[0]
-        else:
-            x = x.split("0.00 (")[0].strip()
-        x = x.replace("₹", "")
-        x = x.replace(",", "")
-        return float(x)
+    def __clean_prices(self, prices):
+        prices = prices.str.split(_PRICE_CHANGE, n=1, regex=True).str[0]
+        prices = prices.str.replace("₹", "", regex=False)
+        prices = prices.str.replace(",", "", regex=False)
+        return prices.str.strip().astype(float)
 
     def __chain(self, expiry_date):
         url = f"https://groww.in/options/{self.ticker}?expiry={expiry_date}"
-        res = requests.get(url)
+        res = self.__session.get(url, timeout=REQUEST_TIMEOUT)
         if res.status_code != 200:
             raise ValueError(f"Status code {res.status_code}. Try again.")
 
@@ -299,8 +457,8 @@ class OptionChain:
         chain = pd.read_html(res.content)[0]
         chain = chain[(chain["OI (lots)"] != "--") & (chain["OI (lots).1"] != "--")]
         chain = chain[["CALL PRICE", "STRIKE PRICE", "PUT PRICE"]]
-        chain["CALL PRICE"] = chain["CALL PRICE"].apply(self.__clean_price)
-        chain["PUT PRICE"] = chain["PUT PRICE"].apply(self.__clean_price)
+        chain["CALL PRICE"] = self.__clean_prices(chain["CALL PRICE"])
+        chain["PUT PRICE"] = self.__clean_prices(chain["PUT PRICE"])
         chain.columns = ["Call", "Strike", "Put"]
         return chain
 
@@ -349,23 +507,27 @@ class OptionChain:
             pd.to_datetime(expiry_date, dayfirst=True) - pd.to_datetime("today")
         ).days / 365
         S = self.spot_price
-        ivs = np.zeros(len(self.__option_chain))
-        bs = BlackScholes()
         r = RISK_FREE_RATE
+        initial_iv = 0.2
+        # IVs already solved on this chain, of either type, are a close start
+        for column in [f"{option_type.title()} IV", "Call IV", "Put IV"]:
+            if column in self.__option_chain:
+                initial_iv = self.__option_chain[column].fillna(0.2).to_numpy()
+                break
         if verbose:
             print("Calculating Implied Volatility")
 
-        for i, row in self.__option_chain.iterrows():
-            ivs[i] = bs.implied_volatility(
-                option_price=row[option_type.title()],
-                S=S,
-                K=row["Strike"],
-                r=r,
-                tau=tau,
-                option_type=option_type.lower(),
-                verbose=0,
-            )
-        median_iv = np.median(ivs)
+        ivs = implied_vol(
+            option_price=self.__option_chain[option_type.title()].to_numpy(),
+            S=S,
+            K=self.__option_chain["Strike"].to_numpy(),
+            r=r,
+            tau=tau,
+            option_type=option_type.lower(),
+            initial_iv=initial_iv,
+            verbose=0,
+        )
+        median_iv = np.nanmedian(ivs)
         if option_type.lower() == "call":
             self.__option_chain["Call IV"] = ivs
             self.call_iv = median_iv
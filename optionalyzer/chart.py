@@ -2,6 +2,8 @@ import numpy as np
 import plotly.graph_objects as go
 import datetime
 
+from optionalyzer import RISK_FREE_RATE
+from optionalyzer.blackscholes import bs_portfolio
 from optionalyzer.options import Options, Call, Put
 
 
@@ -15,6 +17,8 @@ class Position:
     The class represents an option position. Short and Long
     """
 
+    __slots__ = ("option", "_type")
+
     def __init__(self, option: Options, position_type: str) -> None:
         self.option = self.__resolve_option(option=option)
         self._type = self.__resolve_position_type(position_type=position_type)
@@ -29,6 +33,9 @@ class Position:
             return -1
         elif position_type.lower() in ["long", "l"]:
             return 1
+        raise ValueError(
+            f"Invalid position type `{position_type}`. Please use either `long` or `short`."
+        )
 
     def __str__(self) -> str:
         option_string = str(self.option)
@@ -60,7 +67,9 @@ class PayoffChart:
         spot_price: float,
     ) -> None:
         self.positions = self.__resolve_positions(positions=positions)
+        self.__sync_positions()
         self.set_spot_price(spot_price=spot_price)
+        self.__grid = None
 
     def __resolve_positions(self, positions):
         if not isinstance(positions, list):
@@ -73,6 +82,49 @@ class PayoffChart:
                 raise ValueError(f"{position} is not a `Position`.")
         return positions
 
+    def __positions_state(self):
+        # everything the pricing reads from the positions and their options
+        return [
+            (
+                position,
+                position._type,
+                position.option,
+                position.option.strike_price,
+                position.option.iv,
+                position.option.expiry_date,
+            )
+            for position in self.positions
+        ]
+
+    def __check_positions(self):
+        # `positions` and the options are public and can be edited in place,
+        # never price from arrays packed before such an edit
+        if self.__positions_state() != self.__packed_state:
+            self.__sync_positions()
+
+    def __sync_positions(self):
+        # the positions are read on every premium evaluation, keep what the
+        # pricing needs packed in arrays instead of walking the objects
+        self.__packed_state = self.__positions_state()
+        options = [position.option for position in self.positions]
+        n = len(options)
+        self._strikes = np.fromiter(
+            (option.strike_price for option in options), dtype=float, count=n
+        )
+        self._ivs = np.fromiter((option.iv for option in options), dtype=float, count=n)
+        self._is_call = np.fromiter(
+            (isinstance(option, Call) for option in options), dtype=bool, count=n
+        )
+        self._expiries = np.fromiter(
+            (option._expiry_ordinal for option in options),
+            dtype=np.int64,
+            count=n,
+        )
+        self._signs = np.fromiter(
+            (position._type for position in self.positions), dtype=float, count=n
+        )
+        self.__premium_cache = None
+
     def __repr__(self) -> str:
         return f"PayoffChart({self.positions})"
 
@@ -119,14 +171,15 @@ class PayoffChart:
         Position
             The position object.
         """
-        if option_type.lower() == "call":
+        option_type = option_type.lower()
+        if option_type == "call":
             option = Call(
                 strike_price=strike_price,
                 expiry_date=expiry_date,
                 iv=iv,
                 date_format=date_format,
             )
-        elif option_type.lower() == "put":
+        elif option_type == "put":
             option = Put(
                 strike_price=strike_price,
                 expiry_date=expiry_date,
@@ -140,6 +193,7 @@ class PayoffChart:
         pos = Position(option=option, position_type=position_type)
         if add:
             self.positions.append(pos)
+            self.__sync_positions()
         return pos
 
     def create_positions(
@@ -188,9 +242,11 @@ class PayoffChart:
                 option_type=option_type,
                 position_type=position_type,
                 date_format=date_format,
-                add=add,
+                add=False,
             )
             positions.append(position)
+        if add:
+            self.add_positions(positions=positions)
         return positions
 
     def add_positions(
@@ -212,6 +268,7 @@ class PayoffChart:
         """
         positions = self.__resolve_positions(positions=positions)
         self.positions.extend(positions)
+        self.__sync_positions()
 
     def remove_positions(self, positions: list[Position]):
         """
@@ -230,22 +287,7 @@ class PayoffChart:
         for position in positions:
             if position in self.positions:
                 self.positions.remove(position)
-
-    def __correct_price(self, price, position):
-        return price * position._type
-
-    def __calc_premium(
-        self,
-        spot_price,
-        position,
-        date,
-    ):
-        price = position.option.calculate_price(
-            spot_price=spot_price,
-            date=date,
-            return_greeks=False,
-        )
-        return self.__correct_price(price, position)
+        self.__sync_positions()
 
     def total_premium(
         self,
@@ -253,27 +295,46 @@ class PayoffChart:
         date,
     ):
         """
-        Calculate the total premium paid for the options.
+        Calculate the total premium paid for the options. All the positions
+        are priced against all the spot prices in a single pass.
 
         Parameters
         ----------
+        spot_price : float or numpy.ndarray
+            The price(s) of the underlying asset.
         date : str
             The date to calculate the premium. Format: "DD-MM-YYYY"
 
         Returns
         -------
-        float
+        float or numpy.ndarray
             The total premium paid.
         """
-        t_p = 0
-        for i in range(len(self.positions)):
-            pos_pnl = self.__calc_premium(
-                spot_price=spot_price,
-                position=self.positions[i],
-                date=date,
+        self.__check_positions()
+        tau = self.__taus(date=date)
+        return bs_portfolio(
+            spot_price,
+            self._strikes,
+            RISK_FREE_RATE,
+            self._ivs,
+            tau,
+            self._is_call,
+            self._signs,
+        )
+
+    def __taus(self, date):
+        if date is None:
+            date = datetime.date.today()
+        if not isinstance(date, datetime.date):
+            # strings are parsed with the date format of each option
+            return np.array(
+                [position.option._tau(date=date) for position in self.positions],
+                dtype=float,
             )
-            t_p += pos_pnl
-        return t_p
+        days = self._expiries - date.toordinal()
+        if np.any(days < 0):
+            raise ValueError("Execrice Date can not be AFTER the strike date")
+        return days / 365
 
     def __premium_paid(self, spot_price):
         return self.total_premium(
@@ -281,11 +342,56 @@ class PayoffChart:
             spot_price=spot_price,
         )
 
+    def __spot_grid(self, range):
+        key = (self.__spot_price, range, POINTS)
+        if self.__grid is None or self.__grid[0] != key:
+            Ss = np.linspace(
+                self.__spot_price - range * self.__spot_price,
+                self.__spot_price + range * self.__spot_price,
+                POINTS,
+                # the PnL is rounded to the rupee, single precision is plenty
+                dtype=np.float32,
+            )
+            # the grid is shared between calls, guard it against edits
+            Ss.flags.writeable = False
+            self.__grid = (key, Ss)
+        return self.__grid[1]
+
+    def __static_premiums(self, Ss, range):
+        # premium paid and premium at expiry do not depend on `date`, so they
+        # are reused across re-plots until the positions or the grid change
+        key = (self.__spot_price, range, POINTS)
+        if self.__premium_cache is None or self.__premium_cache[0] != key:
+            premium_paid = self.__premium_paid(spot_price=self.__spot_price)
+            premium_at_expiry = self.total_premium(
+                date=self.__min_expiry(), spot_price=Ss
+            )
+            self.__premium_cache = (key, (premium_paid, premium_at_expiry))
+        return self.__premium_cache[1]
+
+    def __figure(self):
+        fig = go.Figure()
+        fig.add_hline(0, line_dash="dash", line_color="white", name="Break Even")
+        fig.add_vline(
+            self.__spot_price,
+            line_dash="dash",
+            line_color="white",
+            name="Strike Price",
+        )
+        fig.update_layout(
+            title="Payoff Chart",
+            xaxis_title="Stock Price",
+            yaxis_title="Price",
+            font=dict(
+                family="Courier New, monospace",
+                size=18,
+                color="RebeccaPurple",
+            ),
+        )
+        return fig
+
     def __min_expiry(self):
-        expiries = []
-        for position in self.positions:
-            expiries.append(position.option.expiry_date)
-        return min(expiries)
+        return datetime.date.fromordinal(self._expiries.min())
 
     def payoff_chart(self, date=None, range=0.1, new_spot_price=None, return_fig=False):
         """
@@ -301,82 +407,77 @@ class PayoffChart:
         new_spot_price : float, optional
             The new spot price. Default is None, which means the original spot price.
         return_fig : bool, optional
-            If True, the plotly figure is returned. Default is False.
+            If True, the plotly figure is returned instead of being shown. Default is False.
 
         Returns:
         -------
         fig : plotly.graph_objects.Figure if return_fig is True
+        Ss : numpy.ndarray if return_fig is False
+            The prices of the underlying asset the chart is plotted over.
         """
         if new_spot_price:
             self.set_spot_price(new_spot_price)
-        if date is None:
-            date = self.__min_expiry()
+        self.__check_positions()
+        Ss = self.__spot_grid(range=range)
+        if not self.positions:
+            # nothing to price, show the empty chart
+            fig = self.__figure()
+            if return_fig:
+                return fig
+            fig.show()
+            return Ss.astype(float)
         min_expiry = self.__min_expiry()
-        Ss = np.linspace(
-            self.__spot_price - range * self.__spot_price,
-            self.__spot_price + range * self.__spot_price,
-            POINTS,
-        )
-        premium_paid = self.__premium_paid(spot_price=self.__spot_price)
-        premium_recieved_at_T = self.total_premium(
-            spot_price=Ss,
-            date=date,
-        )
+        if date is None:
+            date = min_expiry
+        premium_paid, premium_at_expiry = self.__static_premiums(Ss=Ss, range=range)
+        if date == min_expiry:
+            # the default date is the nearest expiry, which is already priced
+            premium_recieved_at_T = premium_at_expiry
+        else:
+            premium_recieved_at_T = self.total_premium(
+                spot_price=Ss,
+                date=date,
+            )
         pnl = premium_recieved_at_T - premium_paid
-        pnl = np.round(pnl, 0) * LOT_SIZE
-
-        pv_pnl_mask = np.argwhere(pnl >= 0)
-        ng_pnl_mask = np.argwhere(pnl < 0)
+        np.rint(pnl, out=pnl)
+        pnl *= LOT_SIZE
 
-        pv_pnl = pnl[pv_pnl_mask].flatten()
-        ng_pnl = pnl[ng_pnl_mask].flatten()
+        pv_pnl_mask = pnl >= 0
+        ng_pnl_mask = ~pv_pnl_mask
 
-        pv_S = Ss[pv_pnl_mask].flatten()
-        ng_S = Ss[ng_pnl_mask].flatten()
+        pv_pnl = pnl[pv_pnl_mask]
+        ng_pnl = pnl[ng_pnl_mask]
 
-        premium_at_expiry = self.total_premium(date=min_expiry, spot_price=Ss)
+        pv_S = Ss[pv_pnl_mask]
+        ng_S = Ss[ng_pnl_mask]
 
         pnl_at_expiry = premium_at_expiry - premium_paid
-        pnl_at_expiry = np.round(pnl_at_expiry, 0) * LOT_SIZE
+        np.rint(pnl_at_expiry, out=pnl_at_expiry)
+        pnl_at_expiry *= LOT_SIZE
 
-        fig = go.Figure()
-        fig.add_hline(0, line_dash="dash", line_color="white", name="Break Even")
-        fig.add_vline(
-            self.__spot_price,
-            line_dash="dash",
-            line_color="white",
-            name="Strike Price",
-        )
+        fig = self.__figure()
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=pv_S, y=pv_pnl, fill="tozeroy", fillcolor="rgba(0,255,0,0.5)", name=""
             )
         )
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=ng_S, y=ng_pnl, fill="tozeroy", fillcolor="rgba(255,0,0,0.5)", name=""
             )
         )
-        fig.add_trace(go.Scatter(x=Ss, y=pnl, name=f"PnL on {date}", line_color="blue"))
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(x=Ss, y=pnl, name=f"PnL on {date}", line_color="blue")
+        )
+        fig.add_trace(
+            go.Scattergl(
                 x=Ss,
                 y=pnl_at_expiry,
                 name="PnL at Expiry",
                 line_color="yellow",
             )
         )
-        fig.update_layout(
-            title="Payoff Chart",
-            xaxis_title="Stock Price",
-            yaxis_title="Price",
-            font=dict(
-                family="Courier New, monospace",
-                size=18,
-                color="RebeccaPurple",
-            ),
-        )
-        fig.show()
         if return_fig:
             return fig
-        return Ss
+        fig.show()
+        return Ss.astype(float)
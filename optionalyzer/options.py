@@ -1,8 +1,17 @@
 import datetime
+import functools
 import numpy as np
 
-from optionalyzer.blackscholes import BlackScholes, RISK_FREE_RATE
 from optionalyzer import RISK_FREE_RATE
+from optionalyzer.blackscholes import bs_call, bs_put
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_date(date_str, date_format):
+    # charts price every position for the same few dates, strptime is slow
+    return datetime.datetime.strptime(date_str, date_format).date()
+
+
 class Options:
     """
     A base class for options.
@@ -17,6 +26,9 @@ class Options:
         The implied volatility of the option.
     """
 
+    # options are created in bulk, keep them free of a per-instance __dict__
+    __slots__ = ("strike_price", "date_format", "_expiry_date", "iv", "_expiry_ordinal")
+
     def __init__(self, strike_price, expiry_date, iv, date_format="%d-%m-%Y") -> None:
         """
         Initialize an option.
@@ -49,6 +61,16 @@ class Options:
         self.expiry_date = self.__str_to_date(expiry_date)
         self.iv = iv
 
+    @property
+    def expiry_date(self):
+        return self._expiry_date
+
+    @expiry_date.setter
+    def expiry_date(self, expiry_date):
+        self._expiry_date = expiry_date
+        # times to expiry are day counts, keep the expiry as a day number
+        self._expiry_ordinal = expiry_date.toordinal()
+
     def calculate_price(self):
         raise NotImplementedError("You must implement the calculate_price method.")
 
@@ -62,7 +84,7 @@ class Options:
         if isinstance(date_str, datetime.date):
             return date_str
         try:
-            date = datetime.datetime.strptime(date_str, self.date_format).date()
+            date = _parse_date(date_str, self.date_format)
         except ValueError:
             raise ValueError(
                 f"Date must be in the format you initialized the class, {self.date_format}. You entered {date_str}"
@@ -74,13 +96,15 @@ class Options:
             date = datetime.date.today()
         else:
             date = self.__str_to_date(date)
-        days = (self.expiry_date - date).days / 365
+        days = self._expiry_ordinal - date.toordinal()
         if days < 0:
             raise ValueError("Execrice Date can not be AFTER the strike date")
-        return days
+        return days / 365
 
 
 class Call(Options):
+    __slots__ = ("__price", "__greeks")
+
     def __init__(self, strike_price, expiry_date, iv, date_format="%d-%m-%Y") -> None:
         super().__init__(strike_price, expiry_date, iv, date_format=date_format)
         self.__price = None
@@ -134,21 +158,27 @@ class Call(Options):
         dict, optional
             The greeks of the call option.
         """
-        bs = BlackScholes()
         tau = self._tau(date=date)
         S = spot_price
         K = self.strike_price
         r = RISK_FREE_RATE
         iv = self.iv
-        price, greeks = bs.call(S, K, r, iv, tau, greeks=True)
+        price, greeks = bs_call(S, K, r, iv, tau, greeks=True)
         self.__price = price
         self.__greeks = greeks
         if return_greeks:
             return price, greeks
         return price
 
-    def intrinsic_value(self, spot_price):
-        return np.maximum(spot_price - self.strike_price, 0)
+    def intrinsic_value(self, spot_price, out=None):
+        """
+        Intrinsic value of the call option at `spot_price`. Pass a buffer as `out`
+        to reuse it when evaluating the same grid of spot prices repeatedly.
+        """
+        if out is None:
+            return np.maximum(spot_price - self.strike_price, 0)
+        np.subtract(spot_price, self.strike_price, out=out)
+        return np.maximum(out, 0, out=out)
 
     def time_value(self, spot_price):
         if self.__price is None:
@@ -160,6 +190,8 @@ class Call(Options):
 
 
 class Put(Options):
+    __slots__ = ("__price", "__greeks")
+
     def __init__(self, strike_price, expiry_date, iv, date_format="%d-%m-%Y") -> None:
         super().__init__(strike_price, expiry_date, iv, date_format=date_format)
         self.__price = None
@@ -211,21 +243,27 @@ class Put(Options):
         dict, optional
             The greeks of the put option.
         """
-        bs = BlackScholes()
         tau = self._tau(date=date)
         S = spot_price
         K = self.strike_price
         r = RISK_FREE_RATE
-        sigma = self.iv
-        price, greeks = bs.put(S, K, r, sigma, tau, greeks=True)
+        iv = self.iv
+        price, greeks = bs_put(S, K, r, iv, tau, greeks=True)
         self.__price = price
         self.__greeks = greeks
         if return_greeks:
             return price, greeks
         return price
 
-    def intrinsic_value(self, spot_price):
-        return np.maximum(self.strike_price - spot_price, 0)
+    def intrinsic_value(self, spot_price, out=None):
+        """
+        Intrinsic value of the put option at `spot_price`. Pass a buffer as `out`
+        to reuse it when evaluating the same grid of spot prices repeatedly.
+        """
+        if out is None:
+            return np.maximum(self.strike_price - spot_price, 0)
+        np.subtract(self.strike_price, spot_price, out=out)
+        return np.maximum(out, 0, out=out)
 
     def time_value(self, spot_price):
         if self.__price is None:
@@ -0,0 +1,89 @@
+from optionalyzer.blackscholes import BlackScholes
+import numpy as np
+import pytest
+
+
+def test_implied_volatility(capsys):
+    bs = BlackScholes()
+    for K in [15000, 18000, 21000]:
+        for option_type in ["call", "put"]:
+            option = bs.call if option_type == "call" else bs.put
+            price = option(18000, K, 0.07, 0.25, 0.1)
+            iv = bs.implied_volatility(
+                price, 18000, K, 0.07, 0.1, option_type=option_type, verbose=0
+            )
+            assert iv == pytest.approx(0.25, abs=1e-4), "IV not recovered"
+    # the positional arguments keep their order, verbose comes after the type
+    price = bs.call(18000, 18500, 0.07, 0.25, 0.1)
+    iv = bs.implied_volatility(price, 18000, 18500, 0.07, 0.1, "call", 0)
+    assert iv == pytest.approx(0.25, abs=1e-4), "IV not recovered"
+    assert capsys.readouterr().out == "", "Positional verbose ignored"
+
+
+def test_implied_volatility_errors():
+    bs = BlackScholes()
+    with pytest.raises(ValueError):
+        bs.implied_volatility(100, 18000, 18000, 0.07, 0.1, option_type="future")
+    iv = bs.implied_volatility(1, 18000, 15000, 0.07, 0.1, verbose=0)
+    assert np.isnan(iv), "Price below intrinsic value has an IV"
+
+
+def test_price_calls_and_puts():
+    bs = BlackScholes()
+    prices = bs.price(18000.0, 18000.0, 0.07, 0.2, 0.1, np.array([True, False]))
+    call = bs.call(18000.0, 18000.0, 0.07, 0.2, 0.1)
+    put = bs.put(18000.0, 18000.0, 0.07, 0.2, 0.1)
+    assert prices == pytest.approx([call, put]), "Wrong prices for calls and puts"
+
+
+def test_implied_volatility_vectorized():
+    bs = BlackScholes()
+    K = np.array([15000, 17000, 18000, 19000, 21000])
+    ivs = np.array([0.3, 0.25, 0.2, 0.22, 0.35])
+    prices = bs.put(18000, K, 0.07, ivs, 0.1)
+    solved = bs.implied_volatility(
+        prices, 18000, K, 0.07, 0.1, option_type="put", verbose=0
+    )
+    assert solved.shape == K.shape, "Shape of IVs does not match the strikes"
+    assert np.allclose(solved, ivs, atol=1e-4), "IVs not recovered"
+    solved = bs.implied_volatility(
+        prices, 18000, K, 0.07, 0.1, option_type="put", initial_iv=ivs, verbose=0
+    )
+    assert np.allclose(solved, ivs, atol=1e-4), "IVs not recovered from a warm start"
+
+
+def test_scalar_price_matches_array_price():
+    bs = BlackScholes()
+    S = np.array([16000.0, 18000.0, 20000.0])
+    for option in [bs.call, bs.put]:
+        prices = option(S, 18000, 0.07, 0.2, 0.1)
+        for s, price in zip(S, prices):
+            assert option(s, 18000, 0.07, 0.2, 0.1) == pytest.approx(price)
+
+
+def test_portfolio_single_precision():
+    bs = BlackScholes()
+    S = np.linspace(16000, 20000, 50)
+    K = np.array([17000.0, 18000.0, 19000.0])
+    ivs = np.array([0.2, 0.15, 0.3])
+    taus = np.array([0.05, 0.1, 0.2])
+    is_call = np.array([True, False, True])
+    quantities = np.array([1.0, -1.0, 2.0])
+    expected = bs.portfolio(S, K, 0.07, ivs, taus, is_call, quantities)
+    values = bs.portfolio(S.astype(np.float32), K, 0.07, ivs, taus, is_call, quantities)
+    assert values.dtype == np.float32, "Single precision grid is not kept"
+    assert np.allclose(values, expected, atol=0.05), "Single precision values differ"
+
+
+def test_portfolio_arguments():
+    bs = BlackScholes()
+    S = np.linspace(16000, 20000, 50)
+    expected = bs.call(S, 17000, 0.07, 0.2, 0.05) - bs.put(S, 18000, 0.07, 0.15, 0.1)
+    values = bs.portfolio(
+        S, [17000, 18000], 0.07, [0.2, 0.15], [0.05, 0.1], [1, 0], [1, -1]
+    )
+    assert np.allclose(values, expected), "Lists not priced like arrays"
+    with pytest.raises(ValueError):
+        bs.portfolio(
+            S, [17000, 18000, 19000], 0.07, [0.2, 0.15], [0.05, 0.1], [1, 0], [1, -1]
+        )
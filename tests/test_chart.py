@@ -0,0 +1,151 @@
+from optionalyzer import chart as chart_module
+from optionalyzer.chart import PayoffChart, Position
+from optionalyzer.options import Call, Put
+import datetime
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+
+def _date(days):
+    return (datetime.date.today() + datetime.timedelta(days=days)).strftime("%d-%m-%Y")
+
+
+def _chart():
+    positions = [
+        Position(Call(18000, _date(30), 0.2), "long"),
+        Position(Put(17500, _date(30), 0.22), "short"),
+        Position(Call(18500, _date(60), 0.18), "short"),
+    ]
+    return PayoffChart(positions, 18000)
+
+
+def test_total_premium():
+    chart = _chart()
+    Ss = np.linspace(16000, 20000, 50)
+    date = _date(10)
+    expected = sum(
+        position._type * position.option.calculate_price(Ss, date) for position in chart
+    )
+    premium = chart.total_premium(spot_price=Ss, date=date)
+    assert premium.shape == Ss.shape, "Premium not calculated for every spot"
+    assert np.allclose(premium, expected), "Premium does not match the positions"
+    assert chart.total_premium(spot_price=Ss[7], date=date) == pytest.approx(
+        expected[7]
+    )
+    date = datetime.date.today() + datetime.timedelta(days=10)
+    premium = chart.total_premium(spot_price=Ss, date=date)
+    assert np.allclose(premium, expected), "Premium differs for a date object"
+
+
+def test_total_premium_at_expiry():
+    chart = _chart()
+    Ss = np.linspace(16000, 20000, 50)
+    premium = chart.total_premium(spot_price=Ss, date=_date(30))
+    assert np.all(np.isfinite(premium)), "Premium at expiry is not finite"
+    with pytest.raises(ValueError):
+        chart.total_premium(spot_price=Ss, date=_date(31))
+    with pytest.raises(ValueError):
+        date = datetime.date.today() + datetime.timedelta(days=31)
+        chart.total_premium(spot_price=Ss, date=date)
+
+
+def test_positions():
+    with pytest.raises(ValueError):
+        Position(Call(18000, _date(30), 0.2), "neutral")
+    chart = _chart()
+    Ss = np.linspace(16000, 20000, 50)
+    date = _date(10)
+    position = chart.create_position(19000, _date(30), 0.2, "put", "long")
+    premium = chart.total_premium(spot_price=Ss, date=date)
+    chart.remove_positions([position])
+    premium -= chart.total_premium(spot_price=Ss, date=date)
+    expected = position.option.calculate_price(Ss, date)
+    assert np.allclose(premium, expected), "Position not added or removed"
+
+
+def test_create_positions():
+    chart = PayoffChart([], 18000)
+    positions = chart.create_positions(
+        [18000, 17500],
+        [_date(30), _date(30)],
+        [0.2, 0.22],
+        ["Call", "put"],
+        ["long", "s"],
+    )
+    assert chart.positions == positions, "Positions not added"
+    Ss = np.linspace(16000, 20000, 50)
+    expected = _chart().total_premium(spot_price=Ss, date=_date(10))
+    chart.create_position(18500, _date(60), 0.18, "call", "short")
+    assert np.allclose(chart.total_premium(spot_price=Ss, date=_date(10)), expected)
+    with pytest.raises(ValueError):
+        chart.create_positions([18000], [_date(30)], [0.2], ["future"], ["long"])
+    assert len(chart.positions) == 3, "Invalid position added"
+
+
+def test_payoff_chart_without_positions(monkeypatch):
+    shown = []
+    monkeypatch.setattr(go.Figure, "show", lambda self: shown.append(self))
+    chart = PayoffChart([], 18000)
+    fig = chart.payoff_chart(return_fig=True)
+    assert len(fig.data) == 0, "Traces plotted without positions"
+    assert not shown, "Returned figure was also shown"
+    Ss = chart.payoff_chart(range=0.2)
+    assert len(shown) == 1, "Figure not shown"
+    assert Ss.min() == pytest.approx(14400), "Grid does not follow the range"
+
+
+def _pnl(fig, name):
+    trace = next(trace for trace in fig.data if trace.name == name)
+    return np.asarray(trace.x, dtype=float), np.asarray(trace.y, dtype=float)
+
+
+def test_payoff_chart(monkeypatch):
+    monkeypatch.setattr(go.Figure, "show", lambda self: None)
+    chart = _chart()
+    premium_paid = sum(
+        position._type * position.option.calculate_price(18000) for position in chart
+    )
+    expiry = datetime.datetime.strptime(_date(30), "%d-%m-%Y").date()
+    for date, width in [(None, 0.1), (_date(10), 0.1), (_date(10), 0.2), (None, 0.2)]:
+        for _ in range(2):
+            fig = chart.payoff_chart(date=date, range=width, return_fig=True)
+            name = f"PnL on {expiry if date is None else date}"
+            Ss, pnl = _pnl(fig, name)
+            assert len(Ss) == chart_module.POINTS, "Wrong number of points"
+            assert Ss.min() == pytest.approx(18000 * (1 - width), rel=1e-6)
+            expected = sum(
+                position._type * position.option.calculate_price(Ss, date or _date(30))
+                for position in chart
+            )
+            expected = (expected - premium_paid) * chart_module.LOT_SIZE
+            assert np.allclose(pnl, expected, atol=chart_module.LOT_SIZE)
+            Ss, pnl_at_expiry = _pnl(fig, "PnL at Expiry")
+            expected = sum(
+                position._type * position.option.calculate_price(Ss, _date(30))
+                for position in chart
+            )
+            expected = (expected - premium_paid) * chart_module.LOT_SIZE
+            assert np.allclose(pnl_at_expiry, expected, atol=chart_module.LOT_SIZE)
+    monkeypatch.setattr(chart_module, "POINTS", 500)
+    fig = chart.payoff_chart(range=0.2, return_fig=True)
+    for trace in fig.data[2:]:
+        assert len(trace.x) == len(trace.y) == 500, "Grid not rebuilt for POINTS"
+
+
+def test_positions_edited_in_place():
+    chart = _chart()
+    Ss = np.linspace(16000, 20000, 50)
+    date = _date(10)
+    chart.total_premium(spot_price=Ss, date=date)
+    chart.positions[0].option.iv = 0.5
+    chart.positions[1]._type = 1
+    chart.positions[1].option.expiry_date += datetime.timedelta(days=5)
+    chart.positions.pop()
+    for date in [_date(10), datetime.date.today() + datetime.timedelta(days=10)]:
+        expected = sum(
+            position._type * position.option.calculate_price(Ss, _date(10))
+            for position in chart
+        )
+        premium = chart.total_premium(spot_price=Ss, date=date)
+        assert np.allclose(premium, expected), "Premium priced from stale positions"
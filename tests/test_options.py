@@ -1,4 +1,5 @@
 from optionalyzer.options import Options, Put, Call
+import numpy as np
 import pytest
 
 
@@ -40,4 +41,15 @@ def test_put_price():
     price = put.calculate_price(115, "21-01-2023")
     assert price >= 0, "Price is less than zero"
     assert price == put.get_price(), "Prices not the same"
-    assert isinstance(put.greeks, dict), "Greeks are not dictionary"
\ No newline at end of file
+    assert isinstance(put.greeks, dict), "Greeks are not dictionary"
+
+
+def test_intrinsic_value():
+    call = Call(111, "25-02-2023", 0.23)
+    put = Put(111, "25-02-2023", 0.23)
+    spot_prices = np.array([100.0, 111.0, 120.0])
+    out = np.empty(3)
+    assert call.intrinsic_value(spot_prices, out=out) is out, "Buffer not used"
+    assert np.array_equal(out, [0, 0, 9]), "Wrong intrinsic value of call"
+    assert np.array_equal(put.intrinsic_value(spot_prices, out=out), [11, 0, 0])
+    assert call.intrinsic_value(120) == 9, "Wrong intrinsic value of call"